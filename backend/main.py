@@ -3,30 +3,60 @@ FastAPI backend for file upload demo application.
 Provides authentication and file upload services with local storage.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, UploadFile, File
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import (
     create_engine,
     Column,
     Integer,
     String,
     DateTime,
+    delete,
+    ForeignKey,
     Boolean,
     Text,
+    Index,
+    case,
+    event,
+    exists,
     func,
+    inspect,
+    insert,
+    text,
     or_,
+    select,
+    tuple_,
 )
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.sql import column as sql_column, table as sql_table
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import (
+    joinedload,
+    relationship,
+    scoped_session,
+    sessionmaker,
+    Session,
+)
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import BinaryIO, Optional
+import asyncio
+import functools
+import hashlib
 import os
+import secrets
+import threading
+import time
 import uuid
 import bcrypt
-from jose import jwt, JWTError
+import jwt
+from cachetools import TTLCache
 from pathlib import Path
-import aiofiles
 from pydantic import BaseModel
 
 # Configuration
@@ -43,6 +73,23 @@ MAX_FILE_SIZE_MB = int(os.environ["MAX_FILE_SIZE_MB"])
 MAX_FILES = int(os.environ["MAX_FILES"])
 CHUNK_SIZE_MB = int(os.environ["CHUNK_SIZE_MB"])
 
+# Structured data files accepted by the upload endpoint
+ALLOWED_CONTENT_TYPES = frozenset(
+    {
+        "text/csv",
+        "application/json",
+        "text/plain",
+        "application/vnd.ms-excel",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "application/xml",
+        "text/xml",
+    }
+)
+ALLOWED_EXTENSIONS = frozenset({".csv", ".json", ".txt", ".xlsx", ".xls", ".xml"})
+
+# Password hashing configuration
+BCRYPT_COST = int(os.environ.get("BCRYPT_COST", "12"))
+
 # CORS configuration
 CORS_ORIGINS = os.environ["CORS_ORIGINS"].split(",")
 
@@ -61,11 +108,52 @@ DEMO_CONTAINER = os.environ["DEMO_CONTAINER"]
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 # Database setup
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=20,
+    max_overflow=40,
+    query_cache_size=1200,
+    # sqlite3 keeps prepared statements per connection; give the optional
+    # filters and cursor variants of each route room beyond the default 128
+    connect_args={"check_same_thread": False, "timeout": 30, "cached_statements": 512},
+)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run concurrently with the single writer
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# Handlers build their responses from the objects they just committed and
+# the session ends with the request, so don't reload them after commit
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# One session per request. Sync dependencies and handlers may run on
+# different threadpool threads, so the scope is a context variable set by the
+# db_session_scope middleware rather than the current thread
+_request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
+ScopedSession = scoped_session(SessionLocal, scopefunc=_request_scope.get)
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    # Column defaults must be callables: a datetime value would be evaluated
+    # once at import and stamp every row with the same time. Naive UTC, as
+    # SQLite stores it, so objects kept across a commit serialize the same
+    # way as rows read back from the database
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)
+
+
 # Database Models
 class User(Base):
     __tablename__ = "users"
@@ -77,9 +165,9 @@ class User(Base):
     role = Column(String, default="user")  # user or admin
     is_active = Column(Boolean, default=True)
     is_first_login = Column(Boolean, default=True)
-    storage_account = Column(String)
-    container = Column(String)
-    created_at = Column(DateTime, default=datetime.now(tz=timezone.utc))
+    storage_account = Column(String, index=True)
+    container = Column(String, index=True)
+    created_at = Column(DateTime, default=utcnow, server_default=func.now())
     last_login = Column(DateTime, nullable=True)
 
 
@@ -93,8 +181,15 @@ class UploadedFile(Base):
     content_type = Column(String)
     file_path = Column(String)
     user_email = Column(String)
-    uploaded_at = Column(DateTime, default=datetime.now(tz=timezone.utc))
+    uploaded_at = Column(DateTime, default=utcnow, server_default=func.now())
     status = Column(String, default="success")
+    sha256 = Column(String(64), nullable=True)
+
+    # A user's file list, newest first; the leading user_email column also
+    # serves lookups by user alone
+    __table_args__ = (
+        Index("ix_uploaded_files_user_uploaded", user_email, uploaded_at),
+    )
 
 
 class StorageAccount(Base):
@@ -105,7 +200,13 @@ class StorageAccount(Base):
     connection_string = Column(Text)
     location = Column(String)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.now(tz=timezone.utc))
+    created_at = Column(DateTime, default=utcnow, server_default=func.now())
+
+    # Deleting an account deletes its containers. Not passive: databases
+    # created before the foreign key existed have no ON DELETE CASCADE
+    containers = relationship(
+        "Container", back_populates="account", cascade="all, delete-orphan"
+    )
 
 
 class Container(Base):
@@ -113,8 +214,16 @@ class Container(Base):
 
     id = Column(String, primary_key=True, index=True)
     name = Column(String, index=True)
-    account_id = Column(String)
-    created_at = Column(DateTime, default=datetime.now(tz=timezone.utc))
+    account_id = Column(String, ForeignKey("storage_accounts.id", ondelete="CASCADE"))
+    created_at = Column(DateTime, default=utcnow, server_default=func.now())
+
+    account = relationship("StorageAccount", back_populates="containers")
+
+    # Container names are unique per storage account; the leading account_id
+    # column also serves lookups by account alone
+    __table_args__ = (
+        Index("ix_container_account_name", account_id, name, unique=True),
+    )
 
 
 class ActivityLog(Base):
@@ -125,13 +234,126 @@ class ActivityLog(Base):
     action = Column(String)
     details = Column(Text, nullable=True)
     status = Column(String)  # success, error, info
-    created_at = Column(DateTime, default=datetime.now(tz=timezone.utc))
+    created_at = Column(DateTime, default=utcnow, server_default=func.now())
 
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
 
+# create_all() skips tables that already exist, so nullable columns added to
+# the models later have to be added explicitly on existing databases
+def add_missing_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table.name} "
+                            f"ADD COLUMN {column.name} {column_type}"
+                        )
+                    )
+
+
+add_missing_columns()
+
+
+# Same for indexes added to the models later
+def create_missing_indexes() -> bool:
+    """Create missing indexes; False if container names can't be made unique"""
+    names_unique = True
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except IntegrityError:
+                if index.name != "ix_container_account_name":
+                    raise
+                # Databases written before the unique index existed may hold
+                # duplicate names in an account. Keep booting with a plain
+                # index on the same columns until they are cleaned up
+                print(
+                    "Warning: duplicate container names within a storage "
+                    "account; ix_container_account_name not created"
+                )
+                names_unique = False
+    with engine.begin() as conn:
+        if names_unique:
+            conn.execute(text("DROP INDEX IF EXISTS ix_container_account_name_legacy"))
+        else:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_container_account_name_legacy "
+                    "ON containers (account_id, name)"
+                )
+            )
+    return names_unique
+
+
+CONTAINER_NAMES_UNIQUE = create_missing_indexes()
+
+
+# Trigram full-text index over users' email and name for the admin search.
+# It is an external-content table over users, kept in sync by triggers
+users_fts = sql_table("users_fts", sql_column("rowid"), sql_column("users_fts"))
+
+
+def create_user_search_index() -> bool:
+    """Create the users_fts index if missing; False if FTS5 is unavailable"""
+    try:
+        with engine.begin() as conn:
+            fts_existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'")
+            ).first()
+            conn.execute(
+                text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+                    "email, name, content='users', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users "
+                    "BEGIN INSERT INTO users_fts(rowid, email, name) "
+                    "VALUES (new.id, new.email, new.name); END"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users "
+                    "BEGIN INSERT INTO users_fts(users_fts, rowid, email, name) "
+                    "VALUES ('delete', old.id, old.email, old.name); END"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TRIGGER IF NOT EXISTS users_fts_au "
+                    "AFTER UPDATE OF email, name ON users "
+                    "BEGIN INSERT INTO users_fts(users_fts, rowid, email, name) "
+                    "VALUES ('delete', old.id, old.email, old.name); "
+                    "INSERT INTO users_fts(rowid, email, name) "
+                    "VALUES (new.id, new.email, new.name); END"
+                )
+            )
+            # Index the users that existed before the table did
+            if not fts_existed:
+                conn.execute(
+                    text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+                )
+    except OperationalError:
+        # SQLite built without FTS5, or older than 3.34 (no trigram tokenizer)
+        return False
+    return True
+
+
+USER_SEARCH_INDEX = create_user_search_index()
+
+
 # Pydantic models
 class UserLogin(BaseModel):
     email: str
@@ -195,6 +417,25 @@ class FileUploadResponse(BaseModel):
     uploaded_at: datetime
 
 
+class FileItem(BaseModel):
+    id: str
+    filename: str
+    size: int
+    content_type: Optional[str]
+    uploaded_at: datetime
+    status: str
+    url: str
+
+
+class ActivityItem(BaseModel):
+    id: int
+    user: str
+    action: str
+    time: str
+    status: str
+    details: Optional[str]
+
+
 class AdminStats(BaseModel):
     total_users: int
     active_users: int
@@ -206,7 +447,11 @@ class AdminStats(BaseModel):
 
 
 # FastAPI app
-app = FastAPI(title="Demo Uploader API", version="1.0.0")
+app = FastAPI(
+    title="Demo Uploader API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -217,78 +462,154 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses (dashboard lists); small ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+@app.middleware("http")
+async def db_session_scope(request: Request, call_next):
+    token = _request_scope.set(object())
+    try:
+        return await call_next(request)
+    finally:
+        ScopedSession.remove()
+        _request_scope.reset(token)
+
+
 # Security
 security = HTTPBearer()
 
+# Verified tokens, keyed by a truncated SHA-256 of the raw token
+_jwt_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_jwt_cache_lock = threading.Lock()
+
+# Short-lived caches for lookups that only change when an admin edits
+# users, storage accounts or containers
+_storage_info_cache: TTLCache = TTLCache(maxsize=5000, ttl=30)
+_containers_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
+
+# Admin storage-accounts overview and dashboard stats; both count files, so
+# uploads drop them too
+_storage_accounts_cache: TTLCache = TTLCache(maxsize=1, ttl=20)
+_admin_stats_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
+# Handlers run in the threadpool, and TTLCache is not thread-safe
+_lookup_cache_lock = threading.Lock()
+
+# Admins whose role claim was recently confirmed against the database
+_admin_cache: TTLCache = TTLCache(maxsize=1000, ttl=30)
+_admin_cache_lock = threading.Lock()
+
 
 # Dependency to get database session
 def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    return ScopedSession()
 
 
 # Password utilities
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(BCRYPT_COST)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
 
-def generate_readable_password() -> str:
-    """Generate a human-readable temporary password"""
-    import random
-
-    adjectives = [
-        "Swift",
-        "Bright",
-        "Clear",
-        "Smart",
-        "Quick",
-        "Fresh",
-        "Bold",
-        "Clean",
-        "Sharp",
-        "Cool",
-        "Fast",
-        "Calm",
-        "Strong",
-        "Safe",
-        "Blue",
-        "Green",
-    ]
+@functools.cache
+def dummy_password_hash() -> str:
+    """Hash checked for unknown emails so they cost as much as a real login"""
+    return hash_password(secrets.token_urlsafe(16))
+
+
+PASSWORD_ADJECTIVES = (
+    "Swift",
+    "Bright",
+    "Clear",
+    "Smart",
+    "Quick",
+    "Fresh",
+    "Bold",
+    "Clean",
+    "Sharp",
+    "Cool",
+    "Fast",
+    "Calm",
+    "Strong",
+    "Safe",
+    "Blue",
+    "Green",
+)
 
-    nouns = [
-        "River",
-        "Mountain",
-        "Ocean",
-        "Forest",
-        "Cloud",
-        "Star",
-        "Moon",
-        "Sun",
-        "Bridge",
-        "Tower",
-        "Garden",
-        "Valley",
-        "Harbor",
-        "Castle",
-        "Island",
-        "Peak",
-    ]
+PASSWORD_NOUNS = (
+    "River",
+    "Mountain",
+    "Ocean",
+    "Forest",
+    "Cloud",
+    "Star",
+    "Moon",
+    "Sun",
+    "Bridge",
+    "Tower",
+    "Garden",
+    "Valley",
+    "Harbor",
+    "Castle",
+    "Island",
+    "Peak",
+)
 
+
+def generate_readable_password() -> str:
+    """Generate a human-readable temporary password"""
     # Format: Adjective + Noun + 3 digits
-    adjective = random.choice(adjectives)
-    noun = random.choice(nouns)
-    number = random.randint(100, 999)
+    adjective = secrets.choice(PASSWORD_ADJECTIVES)
+    noun = secrets.choice(PASSWORD_NOUNS)
+    number = secrets.randbelow(900) + 100
 
     return f"{adjective}{noun}{number}"
 
 
+KB, MB, GB = 1 << 10, 1 << 20, 1 << 30
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count as KB, MB or GB with one decimal"""
+    if size > GB:
+        return f"{size / GB:.1f} GB"
+    if size > MB:
+        return f"{size / MB:.1f} MB"
+    return f"{size / KB:.1f} KB"
+
+
+def save_upload(source: BinaryIO, file_path: Path) -> tuple[int, str]:
+    """Copy an upload to disk, returning its size and SHA-256 hex digest.
+
+    Runs the whole read/hash/write loop in one worker thread, writing each
+    chunk straight to the file descriptor.
+    """
+    max_file_size = MAX_FILE_SIZE_MB * MB
+    chunk_size = CHUNK_SIZE_MB * MB
+    file_size = 0
+    digest = hashlib.sha256()
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        while chunk := source.read(chunk_size):
+            file_size += len(chunk)
+            if file_size > max_file_size:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File size exceeds {MAX_FILE_SIZE_MB}MB limit",
+                )
+            digest.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+    return file_size, digest.hexdigest()
+
+
 # JWT utilities
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -300,27 +621,58 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_token(token: str) -> tuple[str, Optional[str]]:
+    """Return the (email, role) claims of a valid token"""
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    with _jwt_cache_lock:
+        cached = _jwt_cache.get(key)
+    # Never serve a cached entry past the token's own expiry
+    if cached and cached[2] > time.time():
+        return cached[0], cached[1]
+
     try:
-        payload = jwt.decode(
-            credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM]
-        )
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        return str(email)  # Explicitly convert to string to satisfy type checker
-    except JWTError:
+        email = str(email)  # Explicitly convert to string to satisfy type checker
+    except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    # Tokens issued before the role claim was added carry no role
+    role = payload.get("role")
+    exp = payload.get("exp")
+    if exp is not None and exp - time.time() > 0:
+        with _jwt_cache_lock:
+            _jwt_cache[key] = (email, role, exp)
+    return email, role
+
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    email, _ = decode_token(credentials.credentials)
+    return email
+
 
 def verify_admin_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ):
-    email = verify_token(credentials)
-    user = db.query(User).filter(User.email == email).first()
-    if not user or user.role != "admin":
+    email, role = decode_token(credentials.credentials)
+    # Non-admin tokens are rejected from the claim alone
+    if role is not None and role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
+
+    # Admin claims are re-checked against the database (at most every 30s,
+    # and right after any user edit) so a demotion takes effect before the
+    # token expires
+    with _admin_cache_lock:
+        confirmed = email in _admin_cache
+    if not confirmed:
+        role = db.scalar(select(User.role).where(User.email == email))
+        if role != "admin":
+            raise HTTPException(status_code=403, detail="Admin access required")
+        with _admin_cache_lock:
+            _admin_cache[email] = True
     return email
 
 
@@ -335,12 +687,23 @@ def log_activity(
     activity = ActivityLog(
         user_email=user_email, action=action, details=details, status=status
     )
+    # Committed together with the caller's own changes
     db.add(activity)
-    db.commit()
+
+
+def invalidate_caches():
+    """Drop cached lookups so admin edits take effect immediately"""
+    with _lookup_cache_lock:
+        _storage_info_cache.clear()
+        _containers_cache.clear()
+        _storage_accounts_cache.clear()
+        _admin_stats_cache.clear()
+    with _admin_cache_lock:
+        _admin_cache.clear()
 
 
 # Initialize demo users and storage accounts
-def init_demo_data(db: Session):
+async def init_demo_data(db: Session):
     # Demo storage accounts
     demo_storage_accounts = [
         {
@@ -351,40 +714,11 @@ def init_demo_data(db: Session):
         }
     ]
 
-    for account_data in demo_storage_accounts:
-        existing_account = (
-            db.query(StorageAccount)
-            .filter(StorageAccount.id == account_data["id"])
-            .first()
-        )
-        if not existing_account:
-            account = StorageAccount(
-                id=account_data["id"],
-                name=account_data["name"],
-                connection_string=account_data["connection_string"],
-                location=account_data["location"],
-            )
-            db.add(account)
-            db.flush()  # Flush to ensure the storage account has an ID before creating containers
-
     # Demo containers - first create containers since users depend on them
     demo_containers = [
         {"id": "c1", "name": DEMO_CONTAINER, "account_id": "sa1"},
     ]
 
-    for container_data in demo_containers:
-        existing_container = (
-            db.query(Container).filter(Container.id == container_data["id"]).first()
-        )
-        if not existing_container:
-            container = Container(
-                id=container_data["id"],
-                name=container_data["name"],
-                account_id=container_data["account_id"],
-            )
-            db.add(container)
-            db.flush()  # Flush to ensure container is created before users
-
     # Demo users
     demo_users = [
         {
@@ -401,42 +735,102 @@ def init_demo_data(db: Session):
         },
     ]
 
+    # One query per table up front, restricted to the demo rows, instead of
+    # one existence check per record. Demo users are attached by name, so
+    # accounts and containers are matched on the demo names as well
+    account_names = dict(
+        db.query(StorageAccount.id, StorageAccount.name)
+        .filter(
+            or_(
+                StorageAccount.id.in_([a["id"] for a in demo_storage_accounts]),
+                StorageAccount.name == DEMO_STORAGE_ACCOUNT_NAME,
+            )
+        )
+        .all()
+    )
+    container_names = dict(
+        db.query(Container.id, Container.name)
+        .filter(
+            or_(
+                Container.id.in_([c["id"] for c in demo_containers]),
+                Container.name == DEMO_CONTAINER,
+            )
+        )
+        .all()
+    )
+    existing_emails = {
+        email
+        for (email,) in db.query(User.email).filter(
+            User.email.in_([u["email"] for u in demo_users])
+        )
+    }
+
+    new_accounts = []
+    for account_data in demo_storage_accounts:
+        if account_data["id"] not in account_names:
+            new_accounts.append(account_data)
+            account_names[account_data["id"]] = account_data["name"]
+
+    new_containers = []
+    for container_data in demo_containers:
+        if container_data["id"] not in container_names:
+            new_containers.append(container_data)
+            container_names[container_data["id"]] = container_data["name"]
+
+    # Users reference the demo container and storage account by name
+    demo_target_exists = (
+        DEMO_CONTAINER in container_names.values()
+        and DEMO_STORAGE_ACCOUNT_NAME in account_names.values()
+    )
+
+    # Demo users usually share one temporary password, so hash each distinct
+    # password once; they share the salt too, which is fine for demo accounts
+    password_hashes: dict[str, str] = {}
+
+    new_users = []
     created_users = []
     for user_data in demo_users:
-        existing_user = db.query(User).filter(User.email == user_data["email"]).first()
-        if not existing_user:
+        if user_data["email"] not in existing_emails and demo_target_exists:
             password = user_data["password"]
             print(f"Creating user {user_data['email']} with configured password")
+            if password not in password_hashes:
+                password_hashes[password] = await asyncio.to_thread(
+                    hash_password, password
+                )
 
-            # Get the container and storage account from our demo data
-            container = (
-                db.query(Container).filter(Container.name == DEMO_CONTAINER).first()
+            new_users.append(
+                {
+                    "email": user_data["email"],
+                    "name": user_data["name"],
+                    "role": user_data["role"],
+                    "password_hash": password_hashes[password],
+                    "is_first_login": True,
+                    "storage_account": DEMO_STORAGE_ACCOUNT_NAME,
+                    "container": DEMO_CONTAINER,
+                }
             )
-            storage_account = (
-                db.query(StorageAccount)
-                .filter(StorageAccount.name == DEMO_STORAGE_ACCOUNT_NAME)
-                .first()
+            created_users.append(
+                {
+                    "email": user_data["email"],
+                    "password": password,
+                    "role": user_data["role"],
+                }
             )
 
-            if container and storage_account:
-                user = User(
-                    email=user_data["email"],
-                    name=user_data["name"],
-                    role=user_data["role"],
-                    password_hash=hash_password(password),
-                    is_first_login=True,
-                    storage_account=storage_account.name,
-                    container=container.name,
-                )
-                db.add(user)
-                created_users.append(
-                    {
-                        "email": user_data["email"],
-                        "password": password,
-                        "role": user_data["role"],
-                    }
-                )
-
+    # One executemany per table, accounts before the containers that
+    # reference them
+    if new_accounts:
+        db.execute(insert(StorageAccount), new_accounts)
+    if new_containers:
+        db.execute(insert(Container), new_containers)
+    # Users go in as one multi-row INSERT; another worker seeding at the same
+    # time makes the conflicting rows no-ops instead of failing startup
+    if new_users:
+        db.execute(
+            sqlite_insert(User)
+            .values(new_users)
+            .on_conflict_do_nothing(index_elements=["email"])
+        )
     db.commit()
 
 
@@ -445,7 +839,7 @@ def init_demo_data(db: Session):
 async def startup_event():
     db = SessionLocal()
     try:
-        init_demo_data(db)
+        await init_demo_data(db)
     finally:
         db.close()
 
@@ -465,15 +859,19 @@ async def health_check():
 
 
 @app.post("/api/auth/login", response_model=Token)
-async def login(user_login: UserLogin, db: Session = Depends(get_db)):
+def login(user_login: UserLogin, db: Session = Depends(get_db)):
     # Find user
-    user = db.query(User).filter(User.email == user_login.email).first()
+    user = db.scalar(select(User).where(User.email == user_login.email))
     if not user:
+        # Burn the same bcrypt work as a wrong password, so response time
+        # doesn't reveal which emails exist
+        verify_password(user_login.password, dummy_password_hash())
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     # Check if user is active
     if not user.is_active:
         log_activity(db, user.email, "Login failed", "error", "Account is inactive")
+        db.commit()
         raise HTTPException(
             status_code=401,
             detail="Account is inactive. Please contact an administrator.",
@@ -498,17 +896,19 @@ async def login(user_login: UserLogin, db: Session = Depends(get_db)):
     # Verify password
     if not verify_password(user_login.password, user.password_hash):
         log_activity(db, user.email, "Login failed", "error", "Invalid password")
+        db.commit()
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     # Update last login
-    user.last_login = datetime.now(tz=timezone.utc)
-    db.commit()
+    user.last_login = utcnow()
 
     # Log successful login
     log_activity(db, user.email, "Login successful", "success")
 
+    db.commit()
+
     # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "role": user.role})
 
     return {
         "access_token": access_token,
@@ -523,23 +923,24 @@ async def login(user_login: UserLogin, db: Session = Depends(get_db)):
 
 
 @app.post("/api/auth/set-password", response_model=Token)
-async def set_password(user_password: UserSetPassword, db: Session = Depends(get_db)):
+def set_password(user_password: UserSetPassword, db: Session = Depends(get_db)):
     # Find user
-    user = db.query(User).filter(User.email == user_password.email).first()
+    user = db.scalar(select(User).where(User.email == user_password.email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Update password
     user.password_hash = hash_password(user_password.new_password)
     user.is_first_login = False
-    user.last_login = datetime.now(tz=timezone.utc)
-    db.commit()
+    user.last_login = utcnow()
 
     # Log password change
     log_activity(db, user.email, "Password changed", "info")
 
+    db.commit()
+
     # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "role": user.role})
 
     return {
         "access_token": access_token,
@@ -554,59 +955,54 @@ async def set_password(user_password: UserSetPassword, db: Session = Depends(get
 
 
 @app.post("/api/upload", response_model=FileUploadResponse)
-async def upload_file(
+def upload_file(
     file: UploadFile = File(...),
     email: str = Depends(verify_token),
     db: Session = Depends(get_db),
 ):
     # Validate file type (structured data files)
-    allowed_types = {
-        "text/csv",
-        "application/json",
-        "text/plain",
-        "application/vnd.ms-excel",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "application/xml",
-        "text/xml",
-    }
-
-    if file.content_type not in allowed_types and not any(
-        file.filename.lower().endswith(ext)
-        for ext in [".csv", ".json", ".txt", ".xlsx", ".xls", ".xml"]
+    file_extension = Path(file.filename).suffix
+    if (
+        file.content_type not in ALLOWED_CONTENT_TYPES
+        and file_extension.lower() not in ALLOWED_EXTENSIONS
     ):
         raise HTTPException(
             status_code=400,
             detail="File type not allowed. Please upload structured data files (CSV, JSON, TXT, Excel, XML)",
         )
 
-    # Validate file size (100MB limit)
-    content = await file.read()
-    if len(content) > 100 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 100MB limit")
-
-    # Generate unique filename
+    # Stream the file to a temporary name chunk by chunk, enforcing the size
+    # limit as we go
     file_id = str(uuid.uuid4())
-    file_extension = Path(file.filename).suffix
-    filename = f"{file_id}{file_extension}"
+    temp_path = UPLOAD_DIR / f"{file_id}.part"
+    try:
+        file_size, sha256 = save_upload(file.file, temp_path)
+    except BaseException:
+        # Size limit, disk errors or cancellation: never leave a partial file
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    # Store content-addressed: identical uploads share one file on disk
+    filename = f"{sha256}{file_extension.lower()}"
     file_path = UPLOAD_DIR / filename
-
-    # Save file
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(content)
+    if file_path.exists():
+        temp_path.unlink()
+    else:
+        os.replace(temp_path, file_path)
 
     # Save to database
     uploaded_file = UploadedFile(
         id=file_id,
         filename=filename,
         original_filename=file.filename,
-        file_size=len(content),
+        file_size=file_size,
         content_type=file.content_type,
         file_path=str(file_path),
         user_email=email,
         status="success",
+        sha256=sha256,
     )
     db.add(uploaded_file)
-    db.commit()
 
     # Log upload activity
     log_activity(
@@ -614,22 +1010,67 @@ async def upload_file(
         email,
         "File uploaded",
         "success",
-        f"Uploaded {file.filename} ({len(content)} bytes)",
+        f"Uploaded {file.filename} ({file_size} bytes)",
     )
 
+    db.commit()
+    with _lookup_cache_lock:
+        _storage_accounts_cache.clear()
+        _admin_stats_cache.clear()
+
     return FileUploadResponse(
         id=file_id,
         filename=file.filename,
-        size=len(content),
+        size=file_size,
         content_type=file.content_type,
         url=f"/api/files/{file_id}",
         uploaded_at=uploaded_file.uploaded_at,
     )
 
 
-@app.get("/api/files")
-async def list_files(email: str = Depends(verify_token), db: Session = Depends(get_db)):
-    files = db.query(UploadedFile).filter(UploadedFile.user_email == email).all()
+@app.get("/api/files", response_model=list[FileItem])
+def list_files(
+    email: str = Depends(verify_token),
+    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    after_id: Optional[str] = None,
+):
+    """List the user's files, newest first.
+
+    Without ``limit`` every file is returned, which is what the upload portal
+    expects. Pass the id of the last file as ``after_id`` to fetch the next page.
+    """
+    query = (
+        db.query(
+            UploadedFile.id,
+            UploadedFile.original_filename,
+            UploadedFile.file_size,
+            UploadedFile.content_type,
+            UploadedFile.uploaded_at,
+            UploadedFile.status,
+        )
+        .filter(UploadedFile.user_email == email)
+        .order_by(UploadedFile.uploaded_at.desc(), UploadedFile.id.desc())
+    )
+    if after_id is not None:
+        # The cursor must be one of the caller's own files
+        cursor_uploaded_at = db.scalar(
+            select(UploadedFile.uploaded_at).where(
+                UploadedFile.id == after_id, UploadedFile.user_email == email
+            )
+        )
+        if cursor_uploaded_at is None:
+            raise HTTPException(status_code=400, detail="Invalid after_id cursor")
+        query = query.filter(
+            tuple_(UploadedFile.uploaded_at, UploadedFile.id)
+            < tuple_(cursor_uploaded_at, after_id)
+        )
+    else:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    files = query.all()
     return [
         {
             "id": f.id,
@@ -645,11 +1086,16 @@ async def list_files(email: str = Depends(verify_token), db: Session = Depends(g
 
 
 @app.get("/api/user/storage-info")
-async def get_user_storage_info(
+def get_user_storage_info(
     email: str = Depends(verify_token), db: Session = Depends(get_db)
 ):
     """Get storage information for the current user"""
-    user = db.query(User).filter(User.email == email).first()
+    with _lookup_cache_lock:
+        cached = _storage_info_cache.get(email)
+    if cached is not None:
+        return cached
+
+    user = db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -662,112 +1108,114 @@ async def get_user_storage_info(
 
     if not storage_account:
         # Return default info if storage account not found
-        return {
+        storage_info = {
             "account_name": user.storage_account,
             "container_name": user.container,
             "location": "Unknown",
         }
+    else:
+        storage_info = {
+            "account_name": storage_account.name,
+            "container_name": user.container,
+            "location": storage_account.location,
+        }
 
-    return {
-        "account_name": storage_account.name,
-        "container_name": user.container,
-        "location": storage_account.location,
-    }
+    with _lookup_cache_lock:
+        _storage_info_cache[email] = storage_info
+    return storage_info
 
 
 @app.get("/api/containers")
-async def get_available_containers(
+def get_available_containers(
     email: str = Depends(verify_token), db: Session = Depends(get_db)
 ):
     """Get all active containers with their associated storage account info for dropdown selection"""
-    # Only return active storage accounts and their containers
-    storage_accounts = db.query(StorageAccount).filter(StorageAccount.is_active).all()
+    with _lookup_cache_lock:
+        cached = _containers_cache.get("all")
+    if cached is not None:
+        return cached
 
-    result = []
-    for storage_account in storage_accounts:
-        # Get all containers for this storage account
-        containers = (
-            db.query(Container).filter(Container.account_id == storage_account.id).all()
-        )
-
-        for container in containers:
-            result.append(
-                {
-                    "container_id": container.id,
-                    "container_name": container.name,
-                    "storage_account_id": storage_account.id,
-                    "storage_account_name": storage_account.name,
-                    "location": storage_account.location,
-                    "display_name": f"{container.name} ({storage_account.name} - {storage_account.location})",
-                }
-            )
+    # Only return active storage accounts and their containers
+    rows = (
+        db.query(Container, StorageAccount)
+        .join(StorageAccount, Container.account_id == StorageAccount.id)
+        .filter(StorageAccount.is_active)
+        .all()
+    )
 
-    return result
+    containers = [
+        {
+            "container_id": container.id,
+            "container_name": container.name,
+            "storage_account_id": storage_account.id,
+            "storage_account_name": storage_account.name,
+            "location": storage_account.location,
+            "display_name": f"{container.name} ({storage_account.name} - {storage_account.location})",
+        }
+        for container, storage_account in rows
+    ]
+    with _lookup_cache_lock:
+        _containers_cache["all"] = containers
+    return containers
 
 
 # Admin API Endpoints
 @app.get("/api/admin/containers-with-accounts")
-async def get_containers_with_accounts(
+def get_containers_with_accounts(
     admin_email: str = Depends(verify_admin_token), db: Session = Depends(get_db)
 ):
     """Get all containers with their associated storage account info for dropdown selection"""
-    containers = db.query(Container).all()
-
-    result = []
-    for container in containers:
-        # Get the associated storage account for each container
-        storage_account = (
-            db.query(StorageAccount)
-            .filter(StorageAccount.id == container.account_id)
-            .first()
-        )
-
-        if storage_account and storage_account.is_active:
-            result.append(
-                {
-                    "container_id": container.id,
-                    "container_name": container.name,
-                    "storage_account_id": storage_account.id,
-                    "storage_account_name": storage_account.name,
-                    "location": storage_account.location,
-                    # Create a display name for the dropdown that includes both container and storage account
-                    "display_name": f"{container.name} ({storage_account.name} - {storage_account.location})",
-                }
-            )
+    # Join each container to its storage account, skipping inactive accounts
+    rows = (
+        db.query(Container, StorageAccount)
+        .join(StorageAccount, Container.account_id == StorageAccount.id)
+        .filter(StorageAccount.is_active)
+        .all()
+    )
 
-    return result
+    return [
+        {
+            "container_id": container.id,
+            "container_name": container.name,
+            "storage_account_id": storage_account.id,
+            "storage_account_name": storage_account.name,
+            "location": storage_account.location,
+            # Create a display name for the dropdown that includes both container and storage account
+            "display_name": f"{container.name} ({storage_account.name} - {storage_account.location})",
+        }
+        for container, storage_account in rows
+    ]
 
 
 @app.get("/api/admin/stats", response_model=AdminStats)
-async def get_admin_stats(
+def get_admin_stats(
     admin_email: str = Depends(verify_admin_token), db: Session = Depends(get_db)
 ):
     """Get admin dashboard statistics"""
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active).count()
+    with _lookup_cache_lock:
+        cached = _admin_stats_cache.get("all")
+    if cached is not None:
+        return cached
+
+    # One conditional-aggregate scan per table
+    total_users, active_users = db.query(
+        func.count(User.id), func.sum(case((User.is_active, 1), else_=0))
+    ).one()
+    active_users = active_users or 0
     inactive_users = total_users - active_users
 
-    total_uploads = db.query(UploadedFile).count()
-    successful_uploads = (
-        db.query(UploadedFile).filter(UploadedFile.status == "success").count()
-    )
+    total_uploads, successful_uploads, total_size = db.query(
+        func.count(UploadedFile.id),
+        func.sum(case((UploadedFile.status == "success", 1), else_=0)),
+        func.sum(UploadedFile.file_size),
+    ).one()
+    successful_uploads = successful_uploads or 0
     failed_uploads = total_uploads - successful_uploads
 
     # Calculate total storage used
-    total_size = (
-        db.query(UploadedFile).with_entities(func.sum(UploadedFile.file_size)).scalar()
-        or 0
-    )
+    storage_used = format_bytes(total_size or 0)
 
-    # Convert bytes to readable format
-    if total_size > 1024**3:  # GB
-        storage_used = f"{total_size / (1024**3):.1f} GB"
-    elif total_size > 1024**2:  # MB
-        storage_used = f"{total_size / (1024**2):.1f} MB"
-    else:  # KB
-        storage_used = f"{total_size / 1024:.1f} KB"
-
-    return AdminStats(
+    stats = AdminStats(
         total_users=total_users,
         active_users=active_users,
         inactive_users=inactive_users,
@@ -776,18 +1224,26 @@ async def get_admin_stats(
         failed_uploads=failed_uploads,
         storage_used=storage_used,
     )
+    with _lookup_cache_lock:
+        _admin_stats_cache["all"] = stats
+    return stats
 
 
-@app.get("/api/admin/activity")
-async def get_recent_activity(
+@app.get("/api/admin/activity", response_model=list[ActivityItem])
+def get_recent_activity(
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
     limit: int = 20,
+    after_id: Optional[int] = None,
 ):
-    """Get recent activity feed for admin dashboard"""
-    activities = (
-        db.query(ActivityLog).order_by(ActivityLog.created_at.desc()).limit(limit).all()
-    )
+    """Get recent activity feed for admin dashboard.
+
+    Pass the id of the last entry as ``after_id`` to fetch the next page.
+    """
+    query = db.query(ActivityLog)
+    if after_id is not None:
+        query = query.filter(ActivityLog.id < after_id)
+    activities = query.order_by(ActivityLog.id.desc()).limit(limit).all()
 
     return [
         {
@@ -803,23 +1259,42 @@ async def get_recent_activity(
 
 
 @app.get("/api/admin/users")
-async def get_users(
+def get_users(
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
     search: str = "",
     page: int = 1,
     limit: int = 50,
+    after_email: Optional[str] = None,
 ):
-    """Get all users with optional search and pagination"""
-    query = db.query(User)
-
-    if search:
-        query = query.filter(
-            or_(User.email.contains(search), User.name.contains(search))
+    """Get all users with optional search and pagination.
+
+    ``after_email`` (the previous response's ``next_cursor``) seeks past the
+    rows already seen on the email index instead of skipping ``page`` offsets.
+    """
+    conditions = []
+    # Trigrams need at least three characters; shorter terms fall back to
+    # LIKE, as do terms with a NUL byte, which an FTS5 phrase can't hold
+    if search and USER_SEARCH_INDEX and len(search) >= 3 and "\x00" not in search:
+        phrase = '"' + search.replace('"', '""') + '"'
+        conditions.append(
+            User.id.in_(
+                select(users_fts.c.rowid).where(users_fts.c.users_fts.match(phrase))
+            )
         )
-
-    total = query.count()
-    users = query.offset((page - 1) * limit).limit(limit).all()
+    elif search:
+        conditions.append(or_(User.email.contains(search), User.name.contains(search)))
+
+    # Plain COUNT(*) over the table rather than Query.count()'s subquery wrap
+    total = db.execute(
+        select(func.count()).select_from(User).where(*conditions)
+    ).scalar_one()
+    query = db.query(User).filter(*conditions).order_by(User.email)
+    if after_email is not None:
+        query = query.filter(User.email > after_email)
+    else:
+        query = query.offset((page - 1) * limit)
+    users = query.limit(limit).all()
 
     return {
         "users": [
@@ -843,41 +1318,39 @@ async def get_users(
         "total": total,
         "page": page,
         "pages": (total + limit - 1) // limit,
+        "next_cursor": users[-1].email if len(users) == limit else None,
     }
 
 
 @app.post("/api/admin/users")
-async def create_user(
+def create_user(
     user_data: UserCreate,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Create a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    existing_user_id = db.query(User.id).filter(User.email == user_data.email).scalar()
+    if existing_user_id is not None:
         raise HTTPException(
             status_code=400, detail="User with this email already exists"
         )
 
     # Find the container and its associated storage account
-    container = (
-        db.query(Container).filter(Container.id == user_data.container_id).first()
+    container = db.get(
+        Container, user_data.container_id, options=[joinedload(Container.account)]
     )
     if not container:
         raise HTTPException(status_code=404, detail="Container not found")
 
-    # Get the storage account associated with the container
-    storage_account = (
-        db.query(StorageAccount)
-        .filter(StorageAccount.id == container.account_id)
-        .first()
-    )
+    # Loaded in the same query as the container
+    storage_account = container.account
     if not storage_account:
         raise HTTPException(status_code=404, detail="Storage account not found")
 
     # Generate readable temporary password
     temp_password = generate_readable_password()
+    password_hash = hash_password(temp_password)
 
     # Create new user
     new_user = User(
@@ -886,18 +1359,20 @@ async def create_user(
         role=user_data.role,
         storage_account=storage_account.name,
         container=container.name,
-        password_hash=hash_password(temp_password),
+        password_hash=password_hash,
         is_first_login=True,
     )
 
     db.add(new_user)
-    db.commit()
 
     # Log activity
     log_activity(
         db, admin_email, "User created", "info", f"Created user {user_data.email}"
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {
         "id": str(new_user.id),
         "email": new_user.email,
@@ -917,30 +1392,26 @@ async def create_user(
 
 
 @app.put("/api/admin/users/{user_id}")
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Update an existing user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Find the container and its associated storage account
-    container = (
-        db.query(Container).filter(Container.id == user_data.container_id).first()
+    container = db.get(
+        Container, user_data.container_id, options=[joinedload(Container.account)]
     )
     if not container:
         raise HTTPException(status_code=404, detail="Container not found")
 
-    # Get the storage account associated with the container
-    storage_account = (
-        db.query(StorageAccount)
-        .filter(StorageAccount.id == container.account_id)
-        .first()
-    )
+    # Loaded in the same query as the container
+    storage_account = container.account
     if not storage_account:
         raise HTTPException(status_code=404, detail="Storage account not found")
 
@@ -952,13 +1423,14 @@ async def update_user(
     user.container = container.name
     user.is_active = user_data.is_active
 
-    db.commit()
-
     # Log activity
     log_activity(
         db, admin_email, "User updated", "info", f"Updated user {user_data.email}"
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {
         "id": str(user.id),
         "email": user.email,
@@ -973,13 +1445,13 @@ async def update_user(
 
 
 @app.delete("/api/admin/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Delete a user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -989,27 +1461,28 @@ async def delete_user(
 
     user_email = user.email
     db.delete(user)
-    db.commit()
 
     # Log activity
     log_activity(db, admin_email, "User deleted", "info", f"Deleted user {user_email}")
 
+    db.commit()
+    invalidate_caches()
+
     return {"message": "User deleted successfully"}
 
 
 @app.patch("/api/admin/users/{user_id}/toggle")
-async def toggle_user_status(
+def toggle_user_status(
     user_id: int,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Toggle user active status"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.is_active = not user.is_active
-    db.commit()
 
     status = "activated" if user.is_active else "deactivated"
     log_activity(
@@ -1020,89 +1493,87 @@ async def toggle_user_status(
         f"{status.capitalize()} user {user.email}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {"id": str(user.id), "email": user.email, "isActive": user.is_active}
 
 
 # Storage Account Management
 @app.get("/api/admin/storage-accounts")
-async def get_storage_accounts(
+def get_storage_accounts(
     admin_email: str = Depends(verify_admin_token), db: Session = Depends(get_db)
 ):
     """Get all storage accounts with their containers"""
-    accounts = db.query(StorageAccount).all()
-
-    result = []
-    for account in accounts:
-        containers = (
-            db.query(Container).filter(Container.account_id == account.id).all()
+    with _lookup_cache_lock:
+        cached = _storage_accounts_cache.get("all")
+    if cached is not None:
+        return cached
+
+    # One grouped query: accounts -> containers -> users of each container
+    # -> their uploads, aggregated per container
+    rows = (
+        db.query(
+            StorageAccount,
+            Container,
+            func.count(UploadedFile.id),
+            func.coalesce(func.sum(UploadedFile.file_size), 0),
         )
+        .outerjoin(Container, Container.account_id == StorageAccount.id)
+        .outerjoin(User, User.container == Container.name)
+        .outerjoin(UploadedFile, UploadedFile.user_email == User.email)
+        .group_by(StorageAccount.id, Container.id)
+        .order_by(StorageAccount.created_at, Container.created_at)
+        .all()
+    )
 
-        # Mock container statistics (in real implementation, you'd get this from Azure API)
-        container_data = []
-        for container in containers:
-            file_count = (
-                db.query(UploadedFile)
-                .filter(
-                    UploadedFile.user_email.in_(
-                        db.query(User.email).filter(User.container == container.name)
-                    )
-                )
-                .count()
-            )
-
-            total_size = (
-                db.query(UploadedFile)
-                .filter(
-                    UploadedFile.user_email.in_(
-                        db.query(User.email).filter(User.container == container.name)
-                    )
-                )
-                .with_entities(func.sum(UploadedFile.file_size))
-                .scalar()
-                or 0
-            )
-
-            size_str = f"{total_size / (1024**2):.1f} MB" if total_size > 0 else "0 MB"
-
-            container_data.append(
-                {
-                    "id": container.id,
-                    "name": container.name,
-                    "size": size_str,
-                    "files": file_count,
-                    "lastModified": container.created_at,
-                }
-            )
-
-        result.append(
-            {
+    accounts = {}
+    for account, container, file_count, total_size in rows:
+        if account.id not in accounts:
+            accounts[account.id] = {
                 "id": account.id,
                 "name": account.name,
                 "connectionString": account.connection_string,
                 "location": account.location,
                 "isActive": account.is_active,
                 "createdAt": account.created_at,
-                "containers": container_data,
+                "containers": [],
+            }
+        if container is None:
+            continue
+
+        # Mock container statistics (in real implementation, you'd get this from Azure API)
+        size_str = f"{total_size / MB:.1f} MB" if total_size > 0 else "0 MB"
+        accounts[account.id]["containers"].append(
+            {
+                "id": container.id,
+                "name": container.name,
+                "size": size_str,
+                "files": file_count,
+                "lastModified": container.created_at,
             }
         )
 
+    result = list(accounts.values())
+    with _lookup_cache_lock:
+        _storage_accounts_cache["all"] = result
     return result
 
 
 @app.post("/api/admin/storage-accounts")
-async def create_storage_account(
+def create_storage_account(
     account_data: StorageAccountCreate,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Create a new storage account"""
     # Check if account already exists
-    existing_account = (
-        db.query(StorageAccount)
+    existing_account_id = (
+        db.query(StorageAccount.id)
         .filter(StorageAccount.name == account_data.name)
-        .first()
+        .scalar()
     )
-    if existing_account:
+    if existing_account_id is not None:
         raise HTTPException(
             status_code=400, detail="Storage account with this name already exists"
         )
@@ -1117,7 +1588,6 @@ async def create_storage_account(
     )
 
     db.add(new_account)
-    db.commit()
 
     # Log activity
     log_activity(
@@ -1128,6 +1598,9 @@ async def create_storage_account(
         f"Created storage account {account_data.name}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {
         "id": new_account.id,
         "name": new_account.name,
@@ -1140,14 +1613,14 @@ async def create_storage_account(
 
 
 @app.put("/api/admin/storage-accounts/{account_id}")
-async def update_storage_account(
+def update_storage_account(
     account_id: str,
     account_data: StorageAccountUpdate,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Update a storage account"""
-    account = db.query(StorageAccount).filter(StorageAccount.id == account_id).first()
+    account = db.get(StorageAccount, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Storage account not found")
 
@@ -1157,8 +1630,6 @@ async def update_storage_account(
     account.location = account_data.location
     account.is_active = account_data.is_active
 
-    db.commit()
-
     # Log activity
     log_activity(
         db,
@@ -1168,6 +1639,9 @@ async def update_storage_account(
         f"Updated storage account {account_data.name}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {
         "id": account.id,
         "name": account.name,
@@ -1179,19 +1653,21 @@ async def update_storage_account(
 
 
 @app.delete("/api/admin/storage-accounts/{account_id}")
-async def delete_storage_account(
+def delete_storage_account(
     account_id: str,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Delete a storage account"""
-    account = db.query(StorageAccount).filter(StorageAccount.id == account_id).first()
+    account = db.get(StorageAccount, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Storage account not found")
 
-    # Check if any users are using this storage account
-    users_count = db.query(User).filter(User.storage_account == account.name).count()
-    if users_count > 0:
+    # Check if any users are using this storage account; the count for the
+    # error message is only taken when there are some
+    in_use = User.storage_account == account.name
+    if db.scalar(select(exists().where(in_use))):
+        users_count = db.scalar(select(func.count()).select_from(User).where(in_use))
         raise HTTPException(
             status_code=400,
             detail=f"Cannot delete storage account. {users_count} users are still using it.",
@@ -1199,12 +1675,8 @@ async def delete_storage_account(
 
     account_name = account.name
 
-    # Delete associated containers
-    db.query(Container).filter(Container.account_id == account_id).delete()
-
-    # Delete the account
+    # Delete the account; its containers go with it
     db.delete(account)
-    db.commit()
 
     # Log activity
     log_activity(
@@ -1215,49 +1687,62 @@ async def delete_storage_account(
         f"Deleted storage account {account_name}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {"message": "Storage account deleted successfully"}
 
 
+# Built once at import; the parameters are bound per request
+CONTAINER_INSERT = (
+    sqlite_insert(Container)
+    .on_conflict_do_nothing(index_elements=["account_id", "name"])
+    .returning(Container.created_at)
+)
+
+
 @app.post("/api/admin/containers")
-async def create_container(
+def create_container(
     container_data: ContainerCreate,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Create a new container"""
     # Check if account exists
-    account = (
-        db.query(StorageAccount)
-        .filter(StorageAccount.id == container_data.account_id)
-        .first()
-    )
+    account = db.get(StorageAccount, container_data.account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Storage account not found")
 
-    # Check if container already exists in this account
-    existing_container = (
-        db.query(Container)
-        .filter(
-            Container.name == container_data.name,
-            Container.account_id == container_data.account_id,
+    # Insert unless the name is already taken in this account; the unique
+    # (account_id, name) index makes the check and the insert one atomic step
+    container_id = str(uuid.uuid4())
+    values = {
+        "id": container_id,
+        "name": container_data.name,
+        "account_id": container_data.account_id,
+    }
+    if CONTAINER_NAMES_UNIQUE:
+        created_at = db.scalar(CONTAINER_INSERT, values)
+    elif db.scalar(
+        select(
+            exists().where(
+                Container.account_id == container_data.account_id,
+                Container.name == container_data.name,
+            )
         )
-        .first()
-    )
-    if existing_container:
+    ):
+        created_at = None
+    else:
+        # Legacy database without the unique index: nothing to conflict on
+        created_at = db.scalar(
+            insert(Container).returning(Container.created_at), values
+        )
+    if created_at is None:
         raise HTTPException(
             status_code=400,
             detail="Container with this name already exists in this account",
         )
 
-    # Create new container
-    container_id = str(uuid.uuid4())
-    new_container = Container(
-        id=container_id, name=container_data.name, account_id=container_data.account_id
-    )
-
-    db.add(new_container)
-    db.commit()
-
     # Log activity
     log_activity(
         db,
@@ -1267,38 +1752,47 @@ async def create_container(
         f"Created container {container_data.name}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {
-        "id": new_container.id,
-        "name": new_container.name,
+        "id": container_id,
+        "name": container_data.name,
         "size": "0 MB",
         "files": 0,
-        "lastModified": new_container.created_at,
+        "lastModified": created_at,
     }
 
 
 @app.delete("/api/admin/containers/{container_id}")
-async def delete_container(
+def delete_container(
     container_id: str,
     admin_email: str = Depends(verify_admin_token),
     db: Session = Depends(get_db),
 ):
     """Delete a container"""
-    container = db.query(Container).filter(Container.id == container_id).first()
-    if not container:
-        raise HTTPException(status_code=404, detail="Container not found")
-
-    # Check if any users are using this container
-    users_count = db.query(User).filter(User.container == container.name).count()
-    if users_count > 0:
+    # Delete only if no user references it, checked in the same statement
+    container_name = db.scalar(
+        delete(Container)
+        .where(
+            Container.id == container_id,
+            ~exists().where(User.container == Container.name),
+        )
+        .returning(Container.name)
+    )
+    if container_name is None:
+        # Nothing deleted: either the container is missing or still in use
+        name = db.scalar(select(Container.name).where(Container.id == container_id))
+        if name is None:
+            raise HTTPException(status_code=404, detail="Container not found")
+        users_count = db.scalar(
+            select(func.count()).select_from(User).where(User.container == name)
+        )
         raise HTTPException(
             status_code=400,
             detail=f"Cannot delete container. {users_count} users are still using it.",
         )
 
-    container_name = container.name
-    db.delete(container)
-    db.commit()
-
     # Log activity
     log_activity(
         db,
@@ -1308,6 +1802,9 @@ async def delete_container(
         f"Deleted container {container_name}",
     )
 
+    db.commit()
+    invalidate_caches()
+
     return {"message": "Container deleted successfully"}
 
 